@@ -5,26 +5,34 @@
 # ----------------------------------------------------------
 
 
-import importlib
+# Only reload the modules when the add-on is reloaded, not on first load
+if "bpy" in locals():
+    import importlib
+    importlib.reload(utils)
+    importlib.reload(diff_worker)
+    importlib.reload(diff)
+    importlib.reload(operators)
+    importlib.reload(panels)
+else:
+    from . import diff, diff_worker, operators, panels, utils
+
+import bpy
 
-from . import operators, panels, utils
+from .utils import profile_step
 
 modules = (
+    diff,
     operators,
     panels,
     utils,
 )
 
-if "bpy" in locals():
-    importlib.reload(operators)
-    importlib.reload(panels)
-    importlib.reload(utils)
-
 
 def register():
-    for module in modules:
-        importlib.reload(module)
-        module.register()
+    with profile_step("register"):
+        for module in modules:
+            with profile_step(f"{module.__name__.rsplit('.', 1)[-1]}.register"):
+                module.register()
 
 
 def unregister():
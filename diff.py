@@ -0,0 +1,264 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import bpy
+import os
+import json
+import hashlib
+import threading
+
+from pathlib import Path
+
+from .diff_worker import SUMMARY_VERSION
+
+
+CATEGORIES = ("objects", "meshes", "materials", "collections")
+
+WORKER_SCRIPT = Path(__file__).with_name("diff_worker.py")
+
+# Seconds a worker may take to summarize one file
+WORKER_TIMEOUT = 300
+
+# Datablock summaries keyed by the sha256 of the .blend content
+_summary_cache = {}
+
+# Content hashes keyed by (path, size, mtime) so unchanged files are not re-read
+_hash_cache = {}
+
+# The running comparison, if any
+_job = None
+
+
+def file_hash(filepath) -> str:
+    stat = os.stat(filepath)
+    key = (str(filepath), stat.st_size, stat.st_mtime_ns)
+    if key in _hash_cache:
+        return _hash_cache[key]
+
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    _hash_cache[key] = digest.hexdigest()
+    return _hash_cache[key]
+
+
+def get_cache_dir() -> Path:
+    return Path(bpy.utils.extension_path_user(
+        __package__, path="summaries", create=True))
+
+
+def read_cached_summary(cache_file):
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Corrupt or unreadable, remove it so the file gets summarized again
+        cache_file.unlink(missing_ok=True)
+        return None
+
+
+def load_summaries(job, filepaths, cache_dir, blender):
+    import subprocess
+
+    hashes = [file_hash(filepath) for filepath in filepaths]
+    if job["cancelled"]:
+        raise RuntimeError("Comparison cancelled")
+
+    # Spawn one worker per file that was never summarized
+    workers = {}
+    try:
+        for filepath, content_hash in zip(filepaths, hashes):
+            if content_hash in _summary_cache or content_hash in workers:
+                continue
+
+            cache_file = cache_dir / f"{content_hash}.v{SUMMARY_VERSION}.json"
+            if cache_file.exists():
+                summary = read_cached_summary(cache_file)
+                if summary is not None:
+                    _summary_cache[content_hash] = summary
+                    continue
+
+            tmp_file = cache_dir / f"{content_hash}.v{SUMMARY_VERSION}.json.tmp"
+            proc = subprocess.Popen(
+                [blender, "-b", "--factory-startup", "-noaudio",
+                 "--python-exit-code", "1", str(filepath),
+                 "--python", str(WORKER_SCRIPT), "--", str(tmp_file)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL)
+            workers[content_hash] = (proc, filepath, tmp_file, cache_file)
+
+            # Keep the handle so the job can be cancelled
+            job["procs"].append(proc)
+            if job["cancelled"]:
+                raise RuntimeError("Comparison cancelled")
+
+        for content_hash, (proc, filepath, tmp_file, cache_file) in workers.items():
+            if job["cancelled"]:
+                raise RuntimeError("Comparison cancelled")
+            try:
+                returncode = proc.wait(timeout=WORKER_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                raise RuntimeError(
+                    f"Timed out summarizing {os.path.basename(filepath)}")
+            if job["cancelled"]:
+                raise RuntimeError("Comparison cancelled")
+            if returncode != 0 or not tmp_file.exists():
+                raise RuntimeError(
+                    f"Could not summarize {os.path.basename(filepath)}")
+            os.replace(tmp_file, cache_file)
+            summary = read_cached_summary(cache_file)
+            if summary is None:
+                raise RuntimeError(
+                    f"Could not read summary of {os.path.basename(filepath)}")
+            _summary_cache[content_hash] = summary
+    finally:
+        # Don't leave workers or partial output behind when one fails
+        for proc, filepath, tmp_file, cache_file in workers.values():
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            if tmp_file.exists():
+                tmp_file.unlink()
+
+    return [_summary_cache[content_hash] for content_hash in hashes]
+
+
+def describe_change(old, new):
+    parts = []
+    for key in sorted(old.keys() | new.keys()):
+        old_value, new_value = old.get(key), new.get(key)
+        if old_value == new_value:
+            continue
+        if key.endswith("_hash"):
+            # Hashed content, only the fact that it changed is known
+            parts.append(f"{key[:-len('_hash')]} changed")
+        elif isinstance(old_value, list) or isinstance(new_value, list):
+            old_set, new_set = set(old_value or []), set(new_value or [])
+            if old_set == new_set:
+                parts.append(f"{key} reordered")
+            else:
+                parts.append(
+                    f"{key} +{len(new_set - old_set)}/-{len(old_set - new_set)}")
+        else:
+            parts.append(f"{key} {old_value} -> {new_value}")
+    return ", ".join(parts)
+
+
+def diff_summaries(old, new):
+    # Returns (category, name, status, detail) tuples
+    entries = []
+    for category in CATEGORIES:
+        old_blocks = old.get(category, {})
+        new_blocks = new.get(category, {})
+
+        for name in sorted(old_blocks.keys() | new_blocks.keys()):
+            if name not in old_blocks:
+                block = new_blocks[name]
+                detail = f"{block['vertices']} vertices" if category == "meshes" else ""
+                entries.append((category, name, 'ADDED', detail))
+            elif name not in new_blocks:
+                block = old_blocks[name]
+                detail = f"{block['vertices']} vertices" if category == "meshes" else ""
+                entries.append((category, name, 'REMOVED', detail))
+            elif old_blocks[name] != new_blocks[name]:
+                detail = describe_change(old_blocks[name], new_blocks[name])
+                entries.append((category, name, 'CHANGED', detail))
+
+    return entries
+
+
+def _run_compare(job, filepaths, cache_dir, blender):
+    try:
+        old, new = load_summaries(job, filepaths, cache_dir, blender)
+        job["entries"] = diff_summaries(old, new)
+    except Exception as e:
+        job["error"] = str(e)
+
+
+def is_comparing() -> bool:
+    return _job is not None
+
+
+def cancel_compare():
+    # The worker thread notices the flag or its killed workers and stops
+    if _job is None:
+        return
+    _job["cancelled"] = True
+    for proc in list(_job["procs"]):
+        if proc.poll() is None:
+            proc.kill()
+
+
+def start_compare(context, filepaths):
+    global _job
+
+    # Build the job before publishing it, so a failure here can't leave
+    # is_comparing() stuck on True
+    job = {
+        "names": [os.path.basename(p) for p in filepaths],
+        "procs": [],
+        "cancelled": False,
+    }
+    job["thread"] = threading.Thread(
+        target=_run_compare,
+        args=(job, filepaths, get_cache_dir(), bpy.app.binary_path),
+        daemon=True)
+
+    wm = context.window_manager
+    wm.diff_list.clear()
+    wm.diff_status = "Comparing {} (older) -> {} (newer)...".format(*job["names"])
+
+    _job = job
+    _job["thread"].start()
+    # Persistent so loading another file mid-comparison doesn't drop it
+    bpy.app.timers.register(poll_compare, first_interval=0.2, persistent=True)
+
+
+def poll_compare():
+    global _job
+
+    if _job is None:
+        return None
+    if _job["thread"].is_alive():
+        return 0.2  # Check again in 0.2 seconds
+
+    job, _job = _job, None
+
+    wm = bpy.context.window_manager
+    wm.diff_list.clear()
+    wm.diff_list_index = 0
+    if job["cancelled"]:
+        wm.diff_status = "Comparison cancelled"
+    elif "error" in job:
+        wm.diff_status = job["error"]
+    else:
+        for category, name, status, detail in job["entries"]:
+            item = wm.diff_list.add()
+            item.category = category
+            item.name = name
+            item.status = status
+            item.detail = detail
+
+        wm.diff_status = "{} (older) -> {} (newer): {} differences".format(
+            *job["names"], len(job["entries"]))
+
+    # Trigger a redraw of the UI
+    for window in wm.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+    return None  # Don't repeat the timer
+
+
+def register():
+    pass
+
+
+def unregister():
+    global _job
+    cancel_compare()
+    _job = None
+    if bpy.app.timers.is_registered(poll_compare):
+        bpy.app.timers.unregister(poll_compare)
@@ -0,0 +1,149 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Standalone script run inside a background Blender process:
+#   blender -b --factory-startup file.blend --python diff_worker.py -- out.json
+# The add-on only imports it for SUMMARY_VERSION.
+
+import bpy
+import json
+import math
+import sys
+import hashlib
+
+from array import array
+
+# Bump whenever summarize() output changes so old cached summaries are ignored
+SUMMARY_VERSION = 2
+
+# Float precision used for transforms and settings, to ignore float noise
+PRECISION = 4
+
+
+def plain_value(value):
+    # Turn RNA values into something stable to compare and hash
+    if isinstance(value, float):
+        return round(value, PRECISION)
+    if isinstance(value, bpy.types.ID):
+        return value.name_full
+    if isinstance(value, bpy.types.bpy_struct):
+        return None
+    if isinstance(value, (str, bool, int)) or value is None:
+        return value
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    try:
+        return tuple(plain_value(v) for v in value)
+    except TypeError:
+        return None
+
+
+def short_hash(data) -> str:
+    return hashlib.sha1(repr(data).encode()).hexdigest()[:16]
+
+
+def format_vector(vector) -> str:
+    return "({})".format(", ".join(f"{round(v, PRECISION):g}" for v in vector))
+
+
+def rna_settings(struct):
+    settings = []
+    for prop in struct.bl_rna.properties:
+        if prop.identifier == "rna_type" or prop.is_readonly:
+            continue
+        if prop.type not in {'BOOLEAN', 'INT', 'FLOAT', 'STRING', 'ENUM', 'POINTER'}:
+            continue
+        settings.append(
+            (prop.identifier, plain_value(getattr(struct, prop.identifier))))
+    return settings
+
+
+def summarize_object(ob):
+    location, rotation, scale = ob.matrix_world.decompose()
+    return {
+        "type": ob.type,
+        "data": ob.data.name_full if ob.data else "",
+        "parent": ob.parent.name_full if ob.parent else "",
+        "materials": [slot.material.name_full for slot in ob.material_slots
+                      if slot.material],
+        "location": format_vector(location),
+        "rotation": format_vector(
+            math.degrees(a) for a in rotation.to_euler()),
+        "scale": format_vector(scale),
+        "hide_viewport": ob.hide_viewport,
+        "hide_render": ob.hide_render,
+        "hidden": ob.hide_get(),
+        "modifiers": [f"{mod.name} ({mod.type})" for mod in ob.modifiers],
+        "modifiers_hash": short_hash(
+            [(mod.name, mod.type, rna_settings(mod)) for mod in ob.modifiers]),
+    }
+
+
+def summarize_mesh(me):
+    coords = array('f', [0.0]) * (len(me.vertices) * 3)
+    me.vertices.foreach_get("co", coords)
+    loops = array('i', [0]) * len(me.loops)
+    me.loops.foreach_get("vertex_index", loops)
+
+    geometry = hashlib.sha1(coords.tobytes())
+    geometry.update(loops.tobytes())
+
+    return {
+        "vertices": len(me.vertices),
+        "edges": len(me.edges),
+        "faces": len(me.polygons),
+        "geometry_hash": geometry.hexdigest()[:16],
+    }
+
+
+def summarize_material(ma):
+    nodes = []
+    links = []
+    if ma.node_tree:
+        for node in sorted(ma.node_tree.nodes, key=lambda n: n.name):
+            inputs = [(socket.identifier, plain_value(socket.default_value))
+                      for socket in node.inputs
+                      if hasattr(socket, "default_value")]
+            nodes.append((node.name, node.bl_idname, inputs))
+        links = sorted(
+            (link.from_node.name, link.from_socket.identifier,
+             link.to_node.name, link.to_socket.identifier)
+            for link in ma.node_tree.links)
+
+    return {
+        "nodes": len(nodes),
+        "nodes_hash": short_hash((nodes, links)),
+        "color_hash": short_hash(plain_value(
+            (ma.diffuse_color, ma.metallic, ma.roughness))),
+    }
+
+
+def summarize():
+    return {
+        "objects": {
+            ob.name_full: summarize_object(ob) for ob in bpy.data.objects
+        },
+        "meshes": {
+            me.name_full: summarize_mesh(me) for me in bpy.data.meshes
+        },
+        "materials": {
+            ma.name_full: summarize_material(ma) for ma in bpy.data.materials
+        },
+        "collections": {
+            co.name_full: {
+                "objects": sorted(ob.name_full for ob in co.objects),
+                "children": sorted(child.name_full for child in co.children),
+            }
+            for co in bpy.data.collections
+        },
+    }
+
+
+def main():
+    argv = sys.argv
+    out_path = argv[argv.index("--") + 1]
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(summarize(), f)
+
+
+if __name__ == "__main__":
+    main()
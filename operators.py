@@ -5,12 +5,16 @@ from pathlib import Path
 import os
 
 from .utils import (
+    get_suffix_grammar,
     increment_version,
-    update_file_list,
-    load_handler,
     open_current_dir,
     update_file_list
 )
+from .diff import (
+    cancel_compare,
+    is_comparing,
+    start_compare
+)
 
 
 # Operator class to save the blend file with Increased Versioning and Publish
@@ -27,9 +31,8 @@ class SWV_OT_SaveIncrement(bpy.types.Operator):
                 "Blend file is not saved. Please save the file first.")
             return False
 
-        prefs = context.preferences.addons[__package__].preferences
-        filename = bpy.path.basename(bpy.data.filepath)
-        if prefs.publish_suffix in filename:
+        grammar = get_suffix_grammar(context)
+        if grammar.parse(Path(bpy.data.filepath).stem).published:
             cls.poll_message_set(
                 "This file is already published. Should not be incremented")
             return False
@@ -42,13 +45,11 @@ class SWV_OT_SaveIncrement(bpy.types.Operator):
         filename = filepath.stem
         directory = filepath.parent
 
-        # Get the user-defined suffix from preferences
-        prefs = context.preferences.addons[__package__].preferences
-        version_suffix = prefs.version_suffix
+        # Get the suffix grammar from preferences
+        grammar = get_suffix_grammar(context)
 
         # Increment the version number in the filename
-        filename, incremented_version = increment_version(
-            filename, version_suffix)
+        filename, incremented_version = increment_version(filename, grammar)
 
         # Save the current with incremented version_suffix
         inc_path = f"{filename}{incremented_version}.blend"
@@ -77,9 +78,8 @@ class SWV_OT_SavePublish(bpy.types.Operator):
                 "Blend file is not saved. Please save the file first.")
             return False
 
-        prefs = context.preferences.addons[__package__].preferences
-        filename = bpy.path.basename(bpy.data.filepath)
-        if prefs.publish_suffix in filename:
+        grammar = get_suffix_grammar(context)
+        if grammar.parse(Path(bpy.data.filepath).stem).published:
             cls.poll_message_set("This file is already published.")
             return False
 
@@ -91,16 +91,15 @@ class SWV_OT_SavePublish(bpy.types.Operator):
         filename = filepath.stem
         directory = filepath.parent
 
-        # Get the user-defined suffixes from preferences
-        prefs = context.preferences.addons[__package__].preferences
-        version_suffix = prefs.version_suffix
-        publish_suffix = prefs.publish_suffix
+        # Get the suffix grammar from preferences
+        grammar = get_suffix_grammar(context)
 
         filename, incremented_version = increment_version(
-            filename, version_suffix, increment=False)
+            filename, grammar, increment=False)
 
         # Update the published file
-        published_filepath = directory / f"{filename}{publish_suffix}.blend"
+        published_filepath = directory / \
+            f"{filename}{grammar.publish_suffix}.blend"
         bpy.ops.wm.save_as_mainfile(filepath=str(published_filepath))
 
         # Save the current with incremented version_suffix
@@ -185,12 +184,108 @@ class SVM_OT_open_current_dir(bpy.types.Operator):
         return {'FINISHED'}
 
 
+def get_compare_names(context):
+    # Checked files that are still listed for the current file
+    compare_files = context.window_manager.compare_files
+    return [item.name for item in context.scene.file_list
+            if item.name in compare_files]
+
+
+class SWV_OT_ToggleCompare(bpy.types.Operator):
+    bl_idname = "swv.toggle_compare"
+    bl_label = "Toggle Compare"
+    bl_description = "Check two files to compare their datablocks"
+    bl_options = {'INTERNAL'}
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+
+    def execute(self, context):
+        # Stored on the window manager so it isn't saved into the file
+        compare_files = context.window_manager.compare_files
+        index = compare_files.find(self.filepath)
+        if index != -1:
+            compare_files.remove(index)
+            return {'FINISHED'}
+
+        # Keep at most two checked files, dropping the oldest pick
+        for name in [item.name for item in compare_files]:
+            if len(compare_files) < 2:
+                break
+            compare_files.remove(compare_files.find(name))
+
+        compare_files.add().name = self.filepath
+
+        return {'FINISHED'}
+
+
+class SWV_OT_CompareVersions(bpy.types.Operator):
+    bl_idname = "swv.compare_versions"
+    bl_label = "Compare Versions"
+    bl_description = "Compare the datablocks of the two checked files in the background"
+
+    @classmethod
+    def poll(cls, context):
+        saved = bpy.context.blend_data.is_saved
+        if not saved:
+            cls.poll_message_set(
+                "Blend file is not saved. Please save the file first.")
+            return False
+
+        if is_comparing():
+            cls.poll_message_set("A comparison is already running.")
+            return False
+
+        if len(get_compare_names(context)) != 2:
+            cls.poll_message_set("Check exactly two files to compare.")
+            return False
+
+        return True
+
+    def execute(self, context):
+        directory = os.path.dirname(bpy.data.filepath)
+        grammar = get_suffix_grammar(context)
+
+        # Order older -> newer by version, the published file being newest
+        def version_key(name):
+            parsed = grammar.parse(os.path.splitext(name)[0])
+            return parsed.published, parsed.versions
+
+        names = sorted(get_compare_names(context), key=version_key)
+        filepaths = [os.path.join(directory, name) for name in names]
+
+        for full_path in filepaths:
+            if not os.path.exists(full_path):
+                self.report({'ERROR'}, f"File not found: {full_path}")
+                return {'CANCELLED'}
+
+        start_compare(context, filepaths)
+
+        return {'FINISHED'}
+
+
+class SWV_OT_CancelCompare(bpy.types.Operator):
+    bl_idname = "swv.cancel_compare"
+    bl_label = "Cancel Comparison"
+    bl_description = "Stop the running version comparison"
+
+    @classmethod
+    def poll(cls, context):
+        return is_comparing()
+
+    def execute(self, context):
+        cancel_compare()
+        return {'FINISHED'}
+
+
 classes = (
     SWV_OT_SaveIncrement,
     SWV_OT_SavePublish,
     SWV_OT_RefreshFileList,
     SWV_OT_OpenSelectedFile,
     SVM_OT_open_current_dir,
+    SWV_OT_ToggleCompare,
+    SWV_OT_CompareVersions,
+    SWV_OT_CancelCompare,
 )
 
 
@@ -198,12 +293,9 @@ classes = (
 def register():
     for bl_class in classes:
         bpy.utils.register_class(bl_class)
-    bpy.app.handlers.load_post.append(load_handler)
 
 
 # Unregister the add-on
 def unregister():
     for bl_class in reversed(classes):
         bpy.utils.unregister_class(bl_class)
-    if load_handler in bpy.app.handlers.load_post:
-        bpy.app.handlers.load_post.remove(load_handler)
@@ -1,39 +1,32 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import bpy
-from bpy.app.handlers import persistent
 
 from .operators import (
     SWV_OT_SaveIncrement,
     SWV_OT_SavePublish
 )
+from .diff import is_comparing
+from .utils import request_file_list_update
 
 
-def update_panel(self, context):
-    # Check if we're already updating to prevent recursion
-    if getattr(update_panel, "is_updating", False):
-        return
-    
-    update_panel.is_updating = True
-    
-    try:
-        # Unregister the panel
-        try:
-            bpy.utils.unregister_class(SWV_PT_SaveWithVersioningPanel)
-        except:
-            pass
+def apply_panel_category(prefs):
+    panel = SWV_PT_SaveWithVersioningPanel
+    panel.bl_category = prefs.panel_category
 
-        # Update the bl_category
-        prefs = context.preferences.addons[__package__].preferences
-        SWV_PT_SaveWithVersioningPanel.bl_category = prefs.panel_category
+    # Tool panels go at the end, other categories at the top
+    panel.bl_order = 100000 if panel.bl_category == 'Tool' else -100000
 
-        # Re-register the panel
-        bpy.utils.register_class(SWV_PT_SaveWithVersioningPanel)
 
-        # Save the preference
-        context.preferences.addons[__package__].preferences.panel_category = prefs.panel_category
-    finally:
-        update_panel.is_updating = False
+def update_panel(self, context):
+    # Blender only moves a panel to a new category when it is re-registered
+    try:
+        bpy.utils.unregister_class(SWV_PT_SaveWithVersioningPanel)
+    except RuntimeError:
+        pass
+
+    apply_panel_category(self)
+    bpy.utils.register_class(SWV_PT_SaveWithVersioningPanel)
 
 
 class SWV_UL_FileList(bpy.types.UIList):
@@ -43,6 +36,13 @@ class SWV_UL_FileList(bpy.types.UIList):
             text = " | " * (item.indent - 1) + item.name
             row.label(text=text, icon='FILE_BLEND')
 
+            # Checkbox to pick the file for comparison
+            checked = item.name in context.window_manager.compare_files
+            icon = 'CHECKBOX_HLT' if checked else 'CHECKBOX_DEHLT'
+            op = row.operator("swv.toggle_compare", text="",
+                              icon=icon, emboss=False)
+            op.filepath = item.name
+
             # Add publish icon if the file is published
             if item.is_published:
                 row.label(text="", icon='ANTIALIASED')
@@ -67,43 +67,51 @@ class SWV_UL_FileList(bpy.types.UIList):
         return filtered_indices, sorted_indices
 
 
+class SWV_UL_DiffList(bpy.types.UIList):
+    icons = {'ADDED': 'ADD', 'REMOVED': 'REMOVE', 'CHANGED': 'MODIFIER'}
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname):
+        if self.layout_type in {'DEFAULT', 'COMPACT'}:
+            text = f"{item.category}: {item.name}"
+            if item.detail:
+                text += f" ({item.detail})"
+            layout.label(text=text, icon=self.icons[item.status])
+
+
 class SWV_PG_FileItem(bpy.types.PropertyGroup):
     name: bpy.props.StringProperty()
     indent: bpy.props.IntProperty()
     is_published: bpy.props.BoolProperty()
 
 
+class SWV_PG_DiffItem(bpy.types.PropertyGroup):
+    name: bpy.props.StringProperty()
+    category: bpy.props.StringProperty()
+    status: bpy.props.EnumProperty(
+        items=[
+            ('ADDED', "Added", ""),
+            ('REMOVED', "Removed", ""),
+            ('CHANGED', "Changed", ""),
+        ]
+    )
+    detail: bpy.props.StringProperty()
+
+
 class SWV_PT_SaveWithVersioningPanel(bpy.types.Panel):
     bl_label = "Save with Versioning"
     bl_idname = "SWV_PT_SaveWithVersioningPanel"
     bl_space_type = 'VIEW_3D'
     bl_region_type = 'UI'
-    bl_category = 'Tool'  # Default category
-    bl_order = 0  # This will be set dynamically
-
-    @classmethod
-    def poll(cls, context):
-        tool_order = 100000
-        item_order = 100000
-        prefs = context.preferences.addons[__package__].preferences
-        if hasattr(prefs, "panel_category"):
-            cls.bl_category = prefs.panel_category
-            # Set bl_order based on the category
-            if cls.bl_category == 'Tool':
-                # High number for Tool category (to be at the end)
-                cls.bl_order = tool_order
-            else:
-                # Low number for Item category (to be at the end)
-                cls.bl_order = -item_order
-        else:
-            cls.bl_category = "Tool"
-            cls.bl_order = tool_order
-        return True
+    bl_category = 'Tool'  # Set from preferences on register
+    bl_order = 0  # Set from preferences on register
 
     def draw(self, context):
         layout = self.layout
         scene = context.scene
 
+        # Scan the directory the first time the panel is shown
+        request_file_list_update()
+
         # Add save buttons
         row = layout.row()
         row.operator("swv.save_increment", text="Increment", icon="PLUS")
@@ -123,6 +131,20 @@ class SWV_PT_SaveWithVersioningPanel(bpy.types.Panel):
         row.template_list("SWV_UL_FileList", "", scene,
                           "file_list", scene, "file_list_index", rows=10)
 
+        # Compare the two checked files
+        row = layout.row()
+        row.operator("swv.compare_versions", icon="ARROW_LEFTRIGHT")
+        if is_comparing():
+            row.operator("swv.cancel_compare", text="", icon="CANCEL")
+
+        wm = context.window_manager
+        if wm.diff_status:
+            box = layout.box()
+            box.label(text=wm.diff_status, icon="INFO")
+            if wm.diff_list:
+                box.template_list("SWV_UL_DiffList", "", wm,
+                                  "diff_list", wm, "diff_list_index", rows=8)
+
 
 class SWV_PT_VersioningAddonPreferences(bpy.types.AddonPreferences):
     bl_idname = __package__
@@ -183,20 +205,20 @@ def save_versioning_button(self, context):
 
 classes = (
     SWV_UL_FileList,
+    SWV_UL_DiffList,
     SWV_PG_FileItem,
-    SWV_PT_SaveWithVersioningPanel,
+    SWV_PG_DiffItem,
     SWV_PT_VersioningAddonPreferences,
+    SWV_PT_SaveWithVersioningPanel,
 )
 
 
-@persistent
-def load_handler(dummy):
-    # Update panel category on file load
-    bpy.app.timers.register(lambda: update_panel(None, bpy.context))
-
-
 def register():
     for bl_class in classes:
+        if bl_class is SWV_PT_SaveWithVersioningPanel:
+            # Set the category up front so the panel is only registered once
+            prefs = bpy.context.preferences.addons[__package__].preferences
+            apply_panel_category(prefs)
         bpy.utils.register_class(bl_class)
 
     # Register file list properties
@@ -204,14 +226,15 @@ def register():
         type=SWV_PG_FileItem)
     bpy.types.Scene.file_list_index = bpy.props.IntProperty()
 
-    bpy.types.VIEW3D_HT_header.append(save_versioning_button)
-
-    bpy.app.handlers.load_post.append(load_handler)
+    # Register version comparison properties, not saved with the file
+    bpy.types.WindowManager.diff_list = bpy.props.CollectionProperty(
+        type=SWV_PG_DiffItem)
+    bpy.types.WindowManager.diff_list_index = bpy.props.IntProperty()
+    bpy.types.WindowManager.diff_status = bpy.props.StringProperty()
+    bpy.types.WindowManager.compare_files = bpy.props.CollectionProperty(
+        type=bpy.types.PropertyGroup)
 
-    # Load saved preferences
-    addon_prefs = bpy.context.preferences.addons[__package__].preferences
-    if addon_prefs:
-        update_panel(addon_prefs, bpy.context)
+    bpy.types.VIEW3D_HT_header.append(save_versioning_button)
 
 
 def unregister():
@@ -224,31 +247,8 @@ def unregister():
     del bpy.types.Scene.file_list
     del bpy.types.Scene.file_list_index
 
-    bpy.app.handlers.load_post.remove(load_handler)
-
-
-def update_panel(self, context):
-    # Check if we're already updating to prevent recursion
-    if getattr(update_panel, "is_updating", False):
-        return
-    
-    update_panel.is_updating = True
-    
-    try:
-        # Unregister the panel
-        try:
-            bpy.utils.unregister_class(SWV_PT_SaveWithVersioningPanel)
-        except:
-            pass
-
-        # Update the bl_category
-        prefs = context.preferences.addons[__package__].preferences
-        SWV_PT_SaveWithVersioningPanel.bl_category = prefs.panel_category
-
-        # Re-register the panel
-        bpy.utils.register_class(SWV_PT_SaveWithVersioningPanel)
-
-        # Save the preference
-        context.preferences.addons[__package__].preferences.panel_category = prefs.panel_category
-    finally:
-        update_panel.is_updating = False
+    # Unregister version comparison properties
+    del bpy.types.WindowManager.diff_list
+    del bpy.types.WindowManager.diff_list_index
+    del bpy.types.WindowManager.diff_status
+    del bpy.types.WindowManager.compare_files
@@ -3,15 +3,38 @@
 import bpy
 import os
 import re
-import platform
-import subprocess
+import time
 
 from enum import Enum
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import NamedTuple
 
 from pathlib import Path
 from bpy.app.handlers import persistent
 
 
+# Set SWV_PROFILE_STARTUP=1 to print how long each register step takes
+PROFILE_STARTUP = os.environ.get("SWV_PROFILE_STARTUP") == "1"
+
+# The file list is scanned lazily, the first time the panel is drawn
+_file_list_stale = True
+
+
+@contextmanager
+def profile_step(name):
+    if not PROFILE_STARTUP:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Save with Versioning: {name} took {elapsed:.2f} ms")
+
+
 class OS(Enum):
     WINDOWS = "Windows"
     MACOS = "MacOS"
@@ -20,6 +43,8 @@ class OS(Enum):
 
     @staticmethod
     def detect_os():
+        import platform
+
         if os.name == 'nt':
             return OS.WINDOWS
         elif os.name == 'posix' and platform.system() == "Darwin":
@@ -36,6 +61,7 @@ def get_blend_file() -> Path:
 
 
 def open_current_dir() -> None:
+    import subprocess
 
     path = get_blend_file().parent
 
@@ -48,68 +74,146 @@ def open_current_dir() -> None:
             subprocess.Popen(["xdg-open", path])
 
 
-def increment_version(filename, suffix, increment=True):
-    # Extract base suffix and determine digit length
-    base_suffix_match = re.search(r'\D*', suffix)
-    base_suffix = base_suffix_match.group() if base_suffix_match else ''
-    digit_match = re.search(r'\d+$', suffix)
-    digit_len = len(digit_match.group()) if digit_match else 3
-
-    # Generate regex pattern based on base suffix
-    pattern = rf"^(.*?)((?:{re.escape(base_suffix)}\d+)+)$"
-    match = re.match(pattern, filename)
-
-    if match:
-        name, version_part = match.groups()
-        versions = re.findall(rf"{re.escape(base_suffix)}(\d+)", version_part)
-
-        if increment:
-            directory = Path(bpy.data.filepath).parent
-
-            # Try incrementing the last version
-            new_versions = versions[:-1] + \
-                [f"{int(versions[-1]) + 1:0{digit_len}d}"]
-            new_ver = ''.join(f"{base_suffix}{v}" for v in new_versions)
-            new_filename = f"{name}{new_ver}"
-
-            # Check if the incremented filename already exists
-            if (directory / f"{new_filename}.blend").exists():
-                # If it exists, create a new branch
-                new_versions = versions + ["1".zfill(digit_len)]
-                new_ver = ''.join(f"{base_suffix}{v}" for v in new_versions)
-
-            # Ensure the new filename is unique
-            while (directory / f"{name}{new_ver}.blend").exists():
-                last_version = int(new_versions[-1])
-                new_versions[-1] = f"{last_version + 1:0{digit_len}d}"
-                new_ver = ''.join(f"{base_suffix}{v}" for v in new_versions)
+class ParsedName(NamedTuple):
+    base: str
+    versions: tuple
+    published: bool
+
+
+# Parses file stems of the form <base>(<suffix><digits>)*[<publish>]
+class SuffixGrammar:
+    def __init__(self, version_suffix, publish_suffix):
+        # The trailing digits of the suffix give the zero padding
+        digit_match = re.search(r'\d+$', version_suffix)
+        self.digit_len = len(digit_match.group()) if digit_match else 3
+        self.base_suffix = (version_suffix[:digit_match.start()]
+                            if digit_match else version_suffix)
+        self.publish_suffix = publish_suffix
+
+        # First version for files without one, e.g. '_v001'
+        self.first_version = (version_suffix if digit_match
+                              else self.format_versions((1,)))
+
+        # Without a base suffix the versions can only be split by width
+        digits = r'\d+' if self.base_suffix else rf'\d{{{self.digit_len}}}'
+        published = (rf'(?P<published>{re.escape(publish_suffix)})?'
+                     if publish_suffix else '')
+
+        # The lazy base keeps suffix text inside the name part of the base
+        self._pattern = re.compile(
+            rf'(?P<base>.*?)'
+            rf'(?P<versions>(?:{re.escape(self.base_suffix)}{digits})*)'
+            rf'{published}',
+            re.DOTALL)
+
+        self.parse = lru_cache(maxsize=1024)(self._parse)
+
+    def _parse(self, stem) -> ParsedName:
+        match = self._pattern.fullmatch(stem)
+        version_part = match.group('versions')
+
+        if not version_part:
+            versions = ()
+        elif self.base_suffix:
+            versions = tuple(
+                int(v) for v in version_part.split(self.base_suffix)[1:])
         else:
-            new_ver = version_part
+            versions = tuple(
+                int(version_part[i:i + self.digit_len])
+                for i in range(0, len(version_part), self.digit_len))
+
+        published = bool(self.publish_suffix and match.group('published'))
+
+        return ParsedName(match.group('base'), versions, published)
+
+    def format_versions(self, versions) -> str:
+        return ''.join(
+            f"{self.base_suffix}{v:0{self.digit_len}d}" for v in versions)
+
+
+@lru_cache(maxsize=8)
+def suffix_grammar(version_suffix, publish_suffix) -> SuffixGrammar:
+    return SuffixGrammar(version_suffix, publish_suffix)
+
+
+def get_suffix_grammar(context) -> SuffixGrammar:
+    prefs = context.preferences.addons[__package__].preferences
+    return suffix_grammar(prefs.version_suffix, prefs.publish_suffix)
+
+
+def increment_version(filename, grammar, increment=True):
+    parsed = grammar.parse(filename)
+    name = parsed.base
+
+    if not parsed.versions:
+        return name, grammar.first_version
+
+    # Keep the version part exactly as written in the filename
+    version_part = filename[len(name):]
+    if parsed.published:
+        version_part = version_part[:-len(grammar.publish_suffix)]
+
+    if not increment:
+        return name, version_part
+
+    directory = Path(bpy.data.filepath).parent
+
+    # Only the last component is re-padded, earlier ones keep their text
+    if grammar.base_suffix:
+        head = version_part[:version_part.rindex(grammar.base_suffix)]
     else:
-        name = filename
-        new_ver = suffix
+        head = version_part[:-grammar.digit_len]
+
+    # Try incrementing the last version
+    number = parsed.versions[-1] + 1
+
+    # Check if the incremented filename already exists
+    new_ver = head + grammar.format_versions((number,))
+    if (directory / f"{name}{new_ver}.blend").exists():
+        # If it exists, create a new branch
+        head, number = version_part, 1
+        new_ver = head + grammar.format_versions((number,))
+
+    # Ensure the new filename is unique
+    while (directory / f"{name}{new_ver}.blend").exists():
+        number += 1
+        new_ver = head + grammar.format_versions((number,))
 
     return name, new_ver
 
 
 @persistent
 def load_handler(dummy):
-    bpy.app.timers.register(update_file_list_when_ready)
+    global _file_list_stale
+    _file_list_stale = True
 
 
 @persistent
 def save_handler(dummy):
-    bpy.app.timers.register(update_file_list_when_ready)
+    global _file_list_stale
+    _file_list_stale = True
+
+
+def request_file_list_update():
+    # Called from the panel draw, which can't edit scene data itself
+    if not _file_list_stale:
+        return
+    if not bpy.app.timers.is_registered(update_file_list_when_ready):
+        bpy.app.timers.register(update_file_list_when_ready)
 
 
 def update_file_list_when_ready():
     if bpy.context.scene is None:
         return 0.1  # Try again in 0.1 seconds
-    update_file_list(bpy.context)
+    with profile_step("deferred file list scan"):
+        update_file_list(bpy.context)
     return None  # Don't repeat the timer
 
 
 def update_file_list(context):
+    global _file_list_stale
+    _file_list_stale = False
+
     scene = context.scene
     scene.file_list.clear()
 
@@ -119,51 +223,37 @@ def update_file_list(context):
     current_file = bpy.path.basename(bpy.data.filepath)
     directory = os.path.dirname(bpy.data.filepath)
 
-    prefs = context.preferences.addons[__package__].preferences
-    base_suffix = re.search(r'\D*', prefs.version_suffix).group()
-    published_suffix = prefs.publish_suffix
-
-    # Get the base name of the current file (without extension)
-    current_base_name = os.path.splitext(current_file)[0]
-
-    # Remove version suffix and published suffix if present
-    current_base_name = re.split(
-        rf'({re.escape(base_suffix)}\d+)+', current_base_name)[0]
-    if current_base_name.endswith(published_suffix):
-        current_base_name = current_base_name[:-len(published_suffix)]
-
-    # Update the file filtering to include published files
-    files = [f for f in os.listdir(directory) if f.endswith('.blend') and
-             (f.startswith(current_base_name) and
-              (f == current_base_name + '.blend' or
-               re.match(rf'{re.escape(current_base_name)}({re.escape(base_suffix)}\d+)+({re.escape(published_suffix)})?\.blend', f) or
-               f == current_base_name + published_suffix + '.blend'))]
-
-    # Sort files and group them
-    sorted_files = sorted(files)
+    grammar = get_suffix_grammar(context)
+
+    # Get the base name of the current file without version and publish suffixes
+    current_base_name = grammar.parse(os.path.splitext(current_file)[0]).base
+
+    # Keep the files that share the base name, including published files
+    parsed_files = {}
+    for f in os.listdir(directory):
+        if not f.endswith('.blend'):
+            continue
+        parsed = grammar.parse(f[:-len('.blend')])
+        if parsed.base == current_base_name:
+            parsed_files[f] = parsed
+
+    # Sort files and group them by version
+    sorted_files = sorted(parsed_files)
     file_structure = {}
 
     for file in sorted_files:
-        parts = re.findall(
-            rf"({re.escape(base_suffix)}\d+|{re.escape(published_suffix)})", file)
-        if parts:
-            # Remove the published suffix from the key
-            key = ''.join([part for part in parts if part != published_suffix])
-            if key not in file_structure:
-                file_structure[key] = []
-            file_structure[key].append(file)
-        else:
-            file_structure[''] = file_structure.get('', []) + [file]
+        key = parsed_files[file].versions
+        file_structure.setdefault(key, []).append(file)
 
     # Find the published file
     published_file = next(
-        (f for f in sorted_files if published_suffix in f), None)
+        (f for f in sorted_files if parsed_files[f].published), None)
     published_path = os.path.join(
         directory, published_file) if published_file else None
 
     # Add files to the list with proper indentation
     for key, files in file_structure.items():
-        indent = key.count(base_suffix)
+        indent = len(key)
         for file in files:
             file_path = os.path.join(directory, file)
             is_published = False
@@ -213,3 +303,5 @@ def register():
 def unregister():
     bpy.app.handlers.load_post.remove(load_handler)
     bpy.app.handlers.save_post.remove(save_handler)
+    if bpy.app.timers.is_registered(update_file_list_when_ready):
+        bpy.app.timers.unregister(update_file_list_when_ready)